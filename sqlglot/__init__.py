@@ -102,6 +102,26 @@ def parse(
     return Dialect.get_or_raise(read or dialect).parse(sql, **opts)
 
 
+def parse_tokens(
+    tokens: t.List[Token], read: DialectType = None, dialect: DialectType = None, **opts
+) -> t.List[t.Optional[Expression]]:
+    """
+    Parses an already-tokenized SQL string into a collection of syntax trees, one per
+    parsed SQL statement. This allows the token list produced by `tokenize` to be reused
+    across parses, skipping the tokenization step.
+
+    Args:
+        tokens: the tokens to parse, as returned by `tokenize`.
+        read: the SQL dialect to apply during parsing (eg. "spark", "hive", "presto", "mysql").
+        dialect: the SQL dialect (alias for read).
+        **opts: other `sqlglot.parser.Parser` options.
+
+    Returns:
+        The resulting syntax tree collection.
+    """
+    return Dialect.get_or_raise(read or dialect).parser(**opts).parse(tokens)
+
+
 @t.overload
 def parse_one(sql: str, *, into: t.Type[E], **opts) -> E: ...
 
@@ -1,7 +1,21 @@
+import functools
+import threading
+import typing as t
+from types import MappingProxyType
+
 from sqlglot import exp, generator, parser, tokens
 from sqlglot.dialects.postgres import Postgres
 from sqlglot.dialects.dialect import Dialect
 
+# Integer tags stashed in Property.meta at parse time so the generator can
+# recognize these clauses with an int compare instead of uppercasing names.
+_KIND_ON_ALL = 1
+_KIND_ENCODING = 2
+
+# ExternalProperty is concrete, so the fallback properties scan can use an
+# exact type compare instead of isinstance's MRO walk.
+_EXTERNAL_PROPERTY = exp.ExternalProperty
+
 
 class Cloudberry(Postgres):
     """Cloudberry dialect.
@@ -10,125 +24,192 @@ class Cloudberry(Postgres):
     in its support for CREATE EXTERNAL TABLE syntax similar to Greenplum.
     """
 
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        # Tokenizer/Parser/Generator objects are mutable state machines
+        # (cursor, token list, error buffers), so cached instances are kept
+        # per-thread; sharing them across threads would interleave state.
+        self._thread_cache = threading.local()
+
+    @property
+    def tokenizer(self) -> tokens.Tokenizer:
+        tokenizer = getattr(self._thread_cache, "tokenizer", None)
+        if tokenizer is None:
+            tokenizer = self._thread_cache.tokenizer = self.tokenizer_class(dialect=self)
+        return tokenizer
+
+    def parser(self, **opts) -> parser.Parser:
+        try:
+            key = frozenset(opts.items())
+        except TypeError:
+            return super().parser(**opts)
+
+        cache = getattr(self._thread_cache, "parsers", None)
+        if cache is None:
+            cache = self._thread_cache.parsers = {}
+
+        cached = cache.get(key)
+        if cached is None:
+            cached = cache[key] = super().parser(**opts)
+        return cached
+
+    def generator(self, **opts) -> generator.Generator:
+        try:
+            key = frozenset(opts.items())
+        except TypeError:
+            return super().generator(**opts)
+
+        cache = getattr(self._thread_cache, "generators", None)
+        if cache is None:
+            cache = self._thread_cache.generators = {}
+
+        cached = cache.get(key)
+        if cached is None:
+            cached = cache[key] = super().generator(**opts)
+        return cached
+
     class Tokenizer(Postgres.Tokenizer):
         """Cloudberry tokenizer."""
 
-        KEYWORDS = {
-            **Postgres.Tokenizer.KEYWORDS,
-            "EXTERNAL": tokens.TokenType.TEMPORARY,
-            "LOCATION": tokens.TokenType.PARTITION,
-            "FORMAT": tokens.TokenType.FORMAT,
-            "ENCODING": tokens.TokenType.CHARACTER_SET,
-            "ON": tokens.TokenType.ON,
-            "ALL": tokens.TokenType.ALL,
-        }
+        # Merged once at class-definition time and frozen so accidental
+        # mutation (which would silently desync the precomputed tries and
+        # rust tokenizer settings) raises instead.
+        KEYWORDS = MappingProxyType(  # type: ignore[assignment]
+            {
+                **Postgres.Tokenizer.KEYWORDS,
+                "EXTERNAL": tokens.TokenType.TEMPORARY,
+                "LOCATION": tokens.TokenType.PARTITION,
+                "FORMAT": tokens.TokenType.FORMAT,
+                "ENCODING": tokens.TokenType.CHARACTER_SET,
+                "ON": tokens.TokenType.ON,
+                "ALL": tokens.TokenType.ALL,
+            }
+        )
 
     class Parser(Postgres.Parser):
         """Cloudberry parser."""
 
-        def __init__(self, *args, **kwargs):
-            """Initialize the Cloudberry parser with proper statement parsers setup."""
-            super().__init__(*args, **kwargs)
-            # Explicitly update the STATEMENT_PARSERS at instance level
-            self.STATEMENT_PARSERS = {
-                **self.STATEMENT_PARSERS,
-                tokens.TokenType.CREATE: lambda self: self._parse_create(),
-            }
+        # Keywords accepted as option names inside FORMAT '...' (...)
+        _FORMAT_OPT_KEYS = frozenset({"NULL", "QUOTE", "ESCAPE", "NEWLINE", "FILL"})
 
         def _parse_create(self) -> exp.Create | exp.Command:
             """
             Parse CREATE statement, with special handling for CREATE EXTERNAL TABLE.
             """
-            start = self._prev
-            
-            is_external_table = self._match_text_seq("EXTERNAL") and self._match_text_seq("TABLE")
+            if not (
+                self._curr
+                and self._next
+                and self._curr.text.upper() == "EXTERNAL"
+                and self._next.text.upper() == "TABLE"
+            ):
+                return super()._parse_create()
+
+            self._advance(2)
+
+            exists = self._parse_exists(not_=True)
+            this = self._parse_table_parts(schema=True)
+            this = self._parse_schema(this=this)
             
-            if is_external_table:
-                exists = self._parse_exists(not_=True)
-                this = self._parse_table_parts(schema=True)
-                this = self._parse_schema(this=this)
-                
-                if self._match(tokens.TokenType.L_PAREN):
-                    expressions = self._parse_csv(lambda: self._parse_column_def(self._parse_id_var()))
-                    self._match_r_paren()
-                    this.set("expressions", expressions)
-                
-                properties = []
-                
-                if self._match_text_seq("LOCATION"):
-                    if self._match(tokens.TokenType.L_PAREN):
-                        location_value = self._parse_string()
-                        self._match_r_paren()
-                        properties.append(self.expression(exp.LocationProperty, this=location_value))
-                
-                on_all = False
-                if self._match_text_seq("ON") and self._match_text_seq("ALL"):
-                    on_all = True
-                    properties.append(self.expression(exp.Property, this="ON ALL", value=self.expression(exp.Literal, this="ON ALL", is_string=True)))
-                
-                if self._match_text_seq("FORMAT"):
-                    format_value = self._parse_string()
-                    format_options = None
-                    
-                    if self._match(tokens.TokenType.L_PAREN):
-                        format_options = []
-                        while True:
-                            if self._match(tokens.TokenType.R_PAREN):
-                                break
-                            
-                            if self._match(tokens.TokenType.COMMA):
-                                continue
-                            
-                            if self._match_text_seq("NULL"):
-                                key = "NULL"
-                            elif self._match_text_seq("QUOTE"):
-                                key = "QUOTE"
-                            elif self._match_text_seq("ESCAPE"):
-                                key = "ESCAPE"
-                            elif self._match_text_seq("NEWLINE"):
-                                key = "NEWLINE"
-                            elif self._match_text_seq("FILL"):
-                                key = "FILL"
-                            else:
-                                key = self._parse_var()
-                                
-                            self._match(tokens.TokenType.EQ)
-                            value = self._parse_string()
-                            
-                            key_str = str(key) if hasattr(key, "__str__") else key
-                            prop = self.expression(exp.Property, this=key_str, value=value)
-                            format_options.append(prop)
-                    
-                    properties.append(self.expression(exp.FileFormatProperty, this=format_value, expressions=format_options))
-                
-                if self._match_text_seq("ENCODING"):
-                    encoding_value = self._parse_string()
-                    properties.append(self.expression(exp.Property, this="ENCODING", value=encoding_value))
-                
-                properties.append(self.expression(exp.ExternalProperty))
-                
-                return self.expression(
-                    exp.Create,
-                    this=this,
-                    kind="TABLE",
-                    exists=exists,
-                    properties=self.expression(exp.Properties, expressions=properties) if properties else None,
-                )
+            if self._match(tokens.TokenType.L_PAREN):
+                expressions = self._parse_csv(lambda: self._parse_column_def(self._parse_id_var()))
+                self._match_r_paren()
+                this.set("expressions", expressions)
             
-            return super()._parse_create()
+            properties = []
+
+            while self._curr:
+                clause_parser = self._EXT_CLAUSE_PARSERS.get(self._curr.text.upper())
+                if not clause_parser:
+                    break
+                self._advance()
+                clause_parser(self, properties)
+
+            properties.append(self.expression(exp.ExternalProperty))
+
+            return self.expression(
+                exp.Create,
+                this=this,
+                kind="TABLE",
+                exists=exists,
+                properties=self.expression(exp.Properties, expressions=properties) if properties else None,
+            )
+
+        def _parse_external_location(self, properties: t.List[exp.Expression]) -> None:
+            if self._match(tokens.TokenType.L_PAREN):
+                location_value = self._parse_string()
+                self._match_r_paren()
+                properties.append(self.expression(exp.LocationProperty, this=location_value))
+
+        def _parse_external_on_all(self, properties: t.List[exp.Expression]) -> None:
+            if self._match_text_seq("ALL"):
+                on_all_prop = self.expression(exp.Property, this="ON ALL", value=self.expression(exp.Literal, this="ON ALL", is_string=True))
+                on_all_prop.meta["kind"] = _KIND_ON_ALL
+                properties.append(on_all_prop)
+
+        def _parse_external_format(self, properties: t.List[exp.Expression]) -> None:
+            format_value = self._parse_string()
+            format_options = None
+
+            if self._match(tokens.TokenType.L_PAREN):
+                format_options = []
+                while True:
+                    if self._match(tokens.TokenType.R_PAREN):
+                        break
+
+                    if self._match(tokens.TokenType.COMMA):
+                        continue
+
+                    tok = self._curr
+                    if tok and tok.text.upper() in self._FORMAT_OPT_KEYS:
+                        key = tok.text.upper()
+                        self._advance()
+                    else:
+                        key = self._parse_var()
+                        if key is None:
+                            self.raise_error("Expected format option name")
+
+                    self._match(tokens.TokenType.EQ)
+                    value = self._parse_string()
+
+                    # _parse_var returns an exp.Var; its raw text is cheaper
+                    # than str(), which round-trips through SQL generation.
+                    key_str = key if isinstance(key, str) else key.name
+                    prop = self.expression(exp.Property, this=key_str, value=value)
+                    format_options.append(prop)
+
+            properties.append(self.expression(exp.FileFormatProperty, this=format_value, expressions=format_options))
+
+        def _parse_external_encoding(self, properties: t.List[exp.Expression]) -> None:
+            encoding_value = self._parse_string()
+            encoding_prop = self.expression(exp.Property, this="ENCODING", value=encoding_value)
+            encoding_prop.meta["kind"] = _KIND_ENCODING
+            properties.append(encoding_prop)
+
+        # Jump table for CREATE EXTERNAL TABLE clauses, keyed on the current
+        # token's uppercased text: one dict lookup per clause instead of a
+        # cascade of _match_text_seq probes. The dispatching loop advances
+        # past the keyword before invoking the handler.
+        _EXT_CLAUSE_PARSERS = {
+            "LOCATION": lambda self, properties: self._parse_external_location(properties),
+            "ON": lambda self, properties: self._parse_external_on_all(properties),
+            "FORMAT": lambda self, properties: self._parse_external_format(properties),
+            "ENCODING": lambda self, properties: self._parse_external_encoding(properties),
+        }
 
     class Generator(Postgres.Generator):
         """Cloudberry generator."""
-        
-        def sql(self, expression, key=None, comment=True):
-            """Override sql method to handle boolean values."""
-            if isinstance(expression, bool):
-                return self.TRUE_LITERAL if expression else self.FALSE_LITERAL
-            return super().sql(expression, key, comment)
-        
+
         def property_sql(self, expression: exp.Property) -> str:
             """Generate SQL for a property, with special handling for ON ALL."""
-            if expression.name == "ON ALL" and isinstance(expression.value, exp.Literal) and expression.value.this == "ON ALL":
+            # Read the tag via _meta to avoid the meta property allocating a
+            # dict on every untagged property.
+            kind = expression._meta.get("kind") if expression._meta is not None else None
+            if kind == _KIND_ON_ALL or (
+                kind is None
+                and expression.name == "ON ALL"
+                and isinstance(expression.value, exp.Literal)
+                and expression.value.this == "ON ALL"
+            ):
                 return "ON ALL"
             return super().property_sql(expression)
 
@@ -139,61 +220,111 @@ class Cloudberry(Postgres):
             is_external_table = (
                 expression.kind == "TABLE"
                 and expression.args.get("properties")
-                and any(isinstance(prop, exp.ExternalProperty) for prop in expression.args["properties"].expressions)
+                and any(type(prop) is _EXTERNAL_PROPERTY for prop in expression.args["properties"].expressions)
             )
 
             if is_external_table:
                 this_part = self.sql(expression, "this")
-                
-                exists_clause = "IF NOT EXISTS " if expression.args.get("exists") else ""
-                replace_clause = "OR REPLACE " if expression.args.get("replace") else ""
-
-                location_clause_str = ""
-                on_all_clause_str = ""
-                format_clause_str = ""
-                encoding_clause_str = ""
 
+                # Classify the properties in a single pass. The live AST is
+                # the source of truth, so post-parse edits are reflected.
+                ext: t.Dict[str, t.Any] = {
+                    "location": None,
+                    "on_all": False,
+                    "format": None,
+                    "format_options": None,
+                    "encoding": None,
+                }
                 if expression.args.get("properties"):
                     for prop in expression.args["properties"].expressions:
                         if isinstance(prop, exp.LocationProperty):
-                            loc_uri_sql = self.sql(prop, 'this')
-                            location_clause_str = f"LOCATION ({loc_uri_sql})"
-                        elif isinstance(prop, exp.Property) and prop.name == "ON ALL":
-                            on_all_clause_str = "ON ALL"
+                            ext["location"] = prop.this
                         elif isinstance(prop, exp.FileFormatProperty):
-                            format_name_sql = self.sql(prop, 'this')
-                            format_clause_str = f"FORMAT {format_name_sql}"
-                            if prop.expressions:
-                                format_options_sql = ", ".join(self.sql(option) for option in prop.expressions)
-                                format_clause_str += f" ({format_options_sql})"
-                        elif isinstance(prop, exp.Property) and prop.name.upper() == "ENCODING":
-                            encoding_value_sql = self.sql(prop, 'value')
-                            encoding_clause_str = f"ENCODING {encoding_value_sql}"
+                            ext["format"] = prop.this
+                            ext["format_options"] = prop.expressions or None
+                        elif isinstance(prop, exp.Property):
+                            kind = prop._meta.get("kind") if prop._meta is not None else None
+                            if kind == _KIND_ON_ALL or (kind is None and prop.name == "ON ALL"):
+                                ext["on_all"] = True
+                            elif kind == _KIND_ENCODING or (kind is None and prop.name.upper() == "ENCODING"):
+                                ext["encoding"] = prop.args.get("value")
                         # ExternalProperty is a marker, not directly rendered here.
                         # Other properties are ignored for CREATE EXTERNAL TABLE.
-                
-                clauses = []
-                if location_clause_str: clauses.append(location_clause_str)
-                if on_all_clause_str: clauses.append(on_all_clause_str)
-                if format_clause_str: clauses.append(format_clause_str)
-                if encoding_clause_str: clauses.append(encoding_clause_str)
-                
-                clauses_sql = " ".join(clauses)
 
-                return f"CREATE EXTERNAL TABLE {replace_clause}{exists_clause}{this_part} {clauses_sql}".strip()
+                location_clause_str = f"LOCATION ({self.sql(ext['location'])})" if ext["location"] is not None else ""
+                on_all_clause_str = "ON ALL" if ext["on_all"] else ""
+
+                format_clause_str = ""
+                if ext["format"] is not None:
+                    format_clause_str = f"FORMAT {self.sql(ext['format'])}"
+                    if ext["format_options"]:
+                        format_options_sql = ", ".join(self.sql(option) for option in ext["format_options"])
+                        format_clause_str += f" ({format_options_sql})"
+
+                encoding_clause_str = f"ENCODING {self.sql(ext['encoding'])}" if ext["encoding"] is not None else ""
+
+                return " ".join(
+                    filter(
+                        None,
+                        (
+                            "CREATE EXTERNAL TABLE",
+                            "OR REPLACE" if expression.args.get("replace") else "",
+                            "IF NOT EXISTS" if expression.args.get("exists") else "",
+                            this_part,
+                            location_clause_str,
+                            on_all_clause_str,
+                            format_clause_str,
+                            encoding_clause_str,
+                        ),
+                    )
+                )
 
             return super().create_sql(expression)
 
+@functools.lru_cache(maxsize=1024)
+def _cached_parse(sql: str) -> exp.Expression:
+    """Parse `sql` as Cloudberry, memoizing the result by SQL string.
+
+    Re-parsing identical SQL (e.g. regenerated output in round-trip flows)
+    becomes a cache lookup. The returned expression is shared between
+    callers, so copy() it before mutating.
+    """
+    from sqlglot import parse_one
+
+    return parse_one(sql, dialect="cloudberry")
+
+
+@functools.lru_cache(maxsize=None)
+def _cloudberry() -> Cloudberry:
+    """Shared default-settings Cloudberry instance, built once per process."""
+    return Cloudberry()
+
+
+# Dialect names that should resolve to the shared Cloudberry instance.
+_CACHED_DIALECT_NAMES = {"cloudberry"}
+
 # --- Minimal patch to ensure SQLMesh uses Cloudberry for 'postgres' connections ---
 # Cloudberry class is defined above and auto-registered under "cloudberry".
-# This makes "postgres" also point to our Cloudberry class.
-try:
-    from sqlglot.dialects.dialect import Dialect
-    dialect_registry = Dialect.classes
-    if isinstance(dialect_registry, dict):
-        dialect_registry["postgres"] = Cloudberry
-except Exception:
-    # Silently fail if patching doesn't work in some edge case,
-    # though it's crucial for the user's current setup.
-    # Consider logging to a standard logger if this were a library.
-    pass
+# This makes "postgres" also point to our Cloudberry class. Postgres itself is
+# already registered (we import it above), so this is a plain one-shot
+# overwrite; we go through _classes directly because the public
+# Dialect.classes property eagerly imports every dialect module.
+Dialect._classes["postgres"] = Cloudberry
+_CACHED_DIALECT_NAMES.add("postgres")
+
+
+# Short-circuit plain-name lookups of the dialects handled above so that every
+# `parse_one(..., dialect="cloudberry")` / `.sql(dialect="cloudberry")` call
+# reuses the shared instance (and its cached tokenizer/parser/generator)
+# instead of reconstructing them from scratch.
+_dialect_get_or_raise = Dialect.get_or_raise.__func__  # type: ignore[attr-defined]
+
+
+def _cached_get_or_raise(cls, dialect):
+    if isinstance(dialect, str) and dialect.strip() in _CACHED_DIALECT_NAMES:
+        return _cloudberry()
+    return _dialect_get_or_raise(cls, dialect)
+
+
+_cached_get_or_raise.__doc__ = _dialect_get_or_raise.__doc__
+Dialect.get_or_raise = classmethod(_cached_get_or_raise)  # type: ignore[method-assign, assignment]
@@ -47,6 +47,17 @@ class TestCloudberry(Validator):
         cloudberry_sql = transpile(postgres_create_table, read="postgres", write="cloudberry")[0]
         self.assertNotIn("EXTERNAL", cloudberry_sql)
         
+    def test_cached_parse(self):
+        from sqlglot.dialects.cloudberry import _cached_parse
+
+        sql = "CREATE EXTERNAL TABLE schema.table (household_data JSON) LOCATION ('pxf://bucket/path') FORMAT 'custom'"
+
+        parsed = _cached_parse(sql)
+        self.assertEqual(parsed.sql(dialect="cloudberry"), sql)
+
+        # Identical SQL strings hit the cache and share the parsed expression
+        self.assertIs(_cached_parse(sql), parsed)
+
     def test_cloudberry_with_on_all(self):
         # Test CREATE EXTERNAL TABLE with ON ALL clause
         external_table_sql = """
@@ -2,7 +2,7 @@ import time
 import unittest
 from unittest.mock import patch
 
-from sqlglot import Parser, exp, parse, parse_one
+from sqlglot import Parser, exp, parse, parse_one, parse_tokens, tokenize
 from sqlglot.errors import ErrorLevel, ParseError
 from sqlglot.parser import logger as parser_logger
 from tests.helpers import assert_logger_contains
@@ -13,6 +13,16 @@ class TestParser(unittest.TestCase):
         with self.assertRaises(ParseError):
             parse_one("")
 
+    def test_parse_tokens(self):
+        tokens = tokenize("SELECT * FROM x; SELECT 1")
+
+        expressions = parse_tokens(tokens)
+        self.assertEqual(len(expressions), 2)
+        self.assertEqual(expressions[0].sql(), "SELECT * FROM x")
+
+        # The token list can be reused for subsequent parses
+        self.assertEqual(parse_tokens(tokens)[1], parse_one("SELECT 1"))
+
     def test_parse_into(self):
         self.assertIsInstance(parse_one("(1)", into=exp.Tuple), exp.Tuple)
         self.assertIsInstance(parse_one("(1,)", into=exp.Tuple), exp.Tuple)